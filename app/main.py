@@ -4,21 +4,19 @@ from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 import time
 import os
-import asyncio
 from contextlib import asynccontextmanager
 
+import httpx
 from eth_account import Account
 from eth_account.messages import encode_defunct
 
-from .db import new_nonce, get_nonce, clear_nonce, save_link, get_link
+from .db import new_nonce, get_nonce, link_wallet, get_link
 
 # Telegram bot imports
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
 from telegram.ext import Application, CommandHandler, ContextTypes, MessageHandler, filters
 from urllib.parse import quote
 import logging
-import json
-import urllib.request
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -26,12 +24,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "https://turnertelegram.fly.dev")
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")
+
 bot_app = None
+http_client = None
+
+# Short-lived balance cache so repeated "My Wallet" taps don't re-hit the RPC
+BALANCE_CACHE_TTL = 15  # seconds
+BALANCE_CACHE_MAX = 1024  # addresses; oldest fetch is evicted first
+_balance_cache = {}  # address (lowercase) -> (fetched_at, balance_str), in fetch order
 
 def get_connect_keyboard(user_id: str):
     """Build inline keyboard with Connect MetaMask button. Uses MetaMask app link so mobile opens the app directly."""
-    web_url = os.getenv("PUBLIC_BASE_URL", "https://turnertelegram.fly.dev")
-    dapp_url = f"{web_url}?user_key={user_id}"
+    dapp_url = f"{PUBLIC_BASE_URL}?user_key={user_id}"
     # metamask.app.link opens MetaMask app on mobile with our page; on desktop opens MetaMask or browser
     link_url = f"https://metamask.app.link/dapp/{quote(dapp_url, safe='')}"
     keyboard = [
@@ -50,8 +56,6 @@ def get_main_menu_keyboard():
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /start - show welcome and menu with Connect button."""
     user_id = str(update.effective_user.id)
-    web_url = os.getenv("PUBLIC_BASE_URL", "https://turnertelegram.fly.dev")
-    link_url = f"{web_url}?user_key={user_id}"
 
     text = (
         "👋 Welcome!\n\n"
@@ -82,30 +86,42 @@ async def connect_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         reply_markup=get_connect_keyboard(user_id),
     )
 
-def _fetch_eth_balance_sync(address: str) -> str:
+async def _fetch_eth_balance(address: str) -> str:
     """Fetch ETH balance from Arbitrum One RPC. Returns formatted string or '—' on error."""
+    key = address.lower()
+    now = time.monotonic()
+    cached = _balance_cache.get(key)
+    if cached and now - cached[0] < BALANCE_CACHE_TTL:
+        return cached[1]
     try:
-        req = urllib.request.Request(
+        resp = await http_client.post(
             "https://arb1.arbitrum.io/rpc",
-            data=json.dumps({
+            json={
                 "jsonrpc": "2.0",
                 "method": "eth_getBalance",
                 "params": [address, "latest"],
                 "id": 1,
-            }).encode("utf-8"),
-            headers={"Content-Type": "application/json"},
-            method="POST",
+            },
         )
-        with urllib.request.urlopen(req, timeout=8) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-        hex_balance = data.get("result") or "0x0"
-        wei = int(hex_balance, 16)
+        resp.raise_for_status()
+        data = resp.json()
+        # JSON-RPC errors (e.g. rate limiting) arrive as HTTP 200 without a result
+        if "error" in data or data.get("result") is None:
+            raise ValueError(f"RPC error: {data.get('error')}")
+        wei = int(data["result"], 16)
         eth = wei / 1e18
-        return f"{eth:.6g}" if eth < 1e6 else f"{eth:,.2f}"
+        balance_str = f"{eth:.6g}" if eth < 1e6 else f"{eth:,.2f}"
     except Exception as e:
         logger.debug("Balance fetch failed: %s", e)
         return "—"
 
+    # Re-insert at the end so dict order stays oldest-first, then evict from the front
+    _balance_cache.pop(key, None)
+    while len(_balance_cache) >= BALANCE_CACHE_MAX:
+        del _balance_cache[next(iter(_balance_cache))]
+    _balance_cache[key] = (now, balance_str)
+    return balance_str
+
 
 async def wallet_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /wallet - show linked wallet and balance, or prompt to connect."""
@@ -123,7 +139,7 @@ async def wallet_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
     else:
         address, linked_at = link_data
-        balance_str = await asyncio.to_thread(_fetch_eth_balance_sync, address)
+        balance_str = await _fetch_eth_balance(address)
         text = (
             "💼 Your linked wallet\n\n"
             "Address: " + address + "\n"
@@ -157,7 +173,14 @@ async def menu_button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global bot_app
+    global bot_app, http_client
+
+    # One pooled client for outbound RPC calls so TLS connections are reused;
+    # bounded pool so a burst of /wallet taps queues instead of opening sockets without limit
+    http_client = httpx.AsyncClient(
+        timeout=httpx.Timeout(8.0, connect=3.0, pool=5.0),
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    )
 
     bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
     if bot_token:
@@ -172,12 +195,11 @@ async def lifespan(app: FastAPI):
 
             webhook_url = os.getenv("TELEGRAM_WEBHOOK_URL")
             if webhook_url:
-                webhook_secret = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")
                 await bot_app.initialize()
                 await bot_app.start()
                 await bot_app.bot.set_webhook(
                     url=webhook_url,
-                    secret_token=webhook_secret if webhook_secret else None
+                    secret_token=TELEGRAM_WEBHOOK_SECRET if TELEGRAM_WEBHOOK_SECRET else None
                 )
                 logger.info("✅ Telegram webhook set to %s", webhook_url)
             else:
@@ -203,6 +225,8 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error("Error stopping bot: %s", e)
 
+    await http_client.aclose()
+
 app = FastAPI(lifespan=lifespan)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -220,10 +244,9 @@ async def telegram_webhook(request: Request):
     if not bot_app:
         raise HTTPException(500, "Telegram bot not initialized")
 
-    webhook_secret = os.getenv("TELEGRAM_WEBHOOK_SECRET")
-    if webhook_secret:
+    if TELEGRAM_WEBHOOK_SECRET:
         secret_header = request.headers.get("X-Telegram-Bot-Api-Secret-Token")
-        if secret_header != webhook_secret:
+        if secret_header != TELEGRAM_WEBHOOK_SECRET:
             raise HTTPException(403, "Invalid webhook secret")
 
     try:
@@ -265,8 +288,7 @@ async def api_link(req: LinkReq):
     if recovered.lower() != req.address.lower():
         raise HTTPException(400, "bad_signature")
 
-    save_link(req.user_key, req.address)
-    clear_nonce(req.user_key)
+    link_wallet(req.user_key, req.address)
 
     if bot_app:
         try: